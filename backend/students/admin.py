@@ -41,6 +41,16 @@ class TestAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Annotate student_count so the change list doesn't query per row"""
+        return super().get_queryset(request).with_student_count()
+    
+    def student_count(self, obj):
+        """Display number of students with marks"""
+        return obj.student_count
+    student_count.short_description = 'Students'
+    student_count.admin_order_field = 'student_count'
+    
     def get_subjects_count(self, obj):
         """Display number of subjects"""
         return len(obj.subjects) if obj.subjects else 0
@@ -53,6 +63,7 @@ class MarkAdmin(admin.ModelAdmin):
     list_filter = ['test', 'subject_name', 'student__class_name']
     search_fields = ['student__name', 'student__roll_number', 'test__name', 'subject_name']
     autocomplete_fields = ['student']
+    list_select_related = ['student', 'test']
     ordering = ['-test__date', 'student__roll_number']
     
     fieldsets = (
@@ -66,13 +77,6 @@ class MarkAdmin(admin.ModelAdmin):
     
     def get_percentage(self, obj):
         """Display percentage"""
-        return f"{obj.percentage:.1f}%"
+        return f"{obj.percentage or 0:.1f}%"
     get_percentage.short_description = 'Percentage'
-    
-    def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        """Customize foreign key displays"""
-        if db_field.name == "student":
-            kwargs["queryset"] = Student.objects.order_by('roll_number')
-        if db_field.name == "test":
-            kwargs["queryset"] = Test.objects.order_by('-date')
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    get_percentage.admin_order_field = 'percentage'
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-14 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='mark',
+            name='students_ma_test_id_ce8a9d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='mark',
+            index=models.Index(fields=['test', 'student'], include=('marks_obtained', 'max_marks'), name='mark_test_student_covering'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+# Django's icontains on PostgreSQL compiles to UPPER("col"::text) LIKE UPPER(%s),
+# so the trigram indexes are built on that same expression for the planner to use.
+TRIGRAM_INDEXES = [
+    ('students_student_name_trgm', 'name'),
+    ('students_student_roll_number_trgm', 'roll_number'),
+    ('students_student_email_trgm', 'email'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Create pg_trgm GIN indexes for student search (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON students_student '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_mark_test_student_covering'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-14 11:40
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+def clamp_marks_obtained(apps, schema_editor):
+    """
+    Cap marks_obtained at max_marks on rows written before the check
+    existed, so the generated column fits numeric(5,2) and the
+    mark_obtained_lte_max constraint can be added
+    """
+    Mark = apps.get_model('students', 'Mark')
+    Mark.objects.filter(marks_obtained__gt=models.F('max_marks')).update(
+        marks_obtained=models.F('max_marks')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_student_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(clamp_marks_obtained, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='mark',
+            name='percentage',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce(models.F('marks_obtained') * 100.0 / django.db.models.functions.comparison.NullIf(models.F('max_marks'), 0), 0.0), help_text='Percentage for this mark, computed by the database on write', output_field=models.DecimalField(decimal_places=2, max_digits=5)),
+        ),
+        migrations.AddIndex(
+            model_name='mark',
+            index=models.Index(fields=['percentage'], name='mark_percentage_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='mark',
+            constraint=models.CheckConstraint(condition=models.Q(('marks_obtained__lte', models.F('max_marks'))), name='mark_obtained_lte_max'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Coalesce, NullIf
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils.functional import cached_property
 
 
 class Student(models.Model):
@@ -22,6 +25,12 @@ class Student(models.Model):
         return f"{self.name} ({self.roll_number})"
 
 
+class TestQuerySet(models.QuerySet):
+    def with_student_count(self):
+        """Annotate the number of unique students who have marks for each test"""
+        return self.annotate(student_count=models.Count('marks__student', distinct=True))
+
+
 class Test(models.Model):
     """Test/Exam model with subjects stored as JSON"""
     name = models.CharField(max_length=255)
@@ -30,6 +39,8 @@ class Test(models.Model):
         help_text="Array of subjects with name and max_marks. Example: [{'name': 'Math', 'max_marks': 100}]"
     )
 
+    objects = TestQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date']
         indexes = [
@@ -39,10 +50,15 @@ class Test(models.Model):
     def __str__(self):
         return f"{self.name} - {self.date}"
 
-    @property
-    def student_count(self):
-        """Count unique students who have marks for this test"""
-        return Mark.objects.filter(test=self).values('student').distinct().count()
+    @cached_property
+    def subject_names_set(self):
+        """Set of subject names for O(1) membership checks"""
+        return {s['name'] for s in self.subjects}
+
+    @cached_property
+    def subject_max_map(self):
+        """Mapping of subject name to its max_marks"""
+        return {s['name']: s['max_marks'] for s in self.subjects}
 
 
 class Mark(models.Model):
@@ -64,25 +80,36 @@ class Mark(models.Model):
     max_marks = models.IntegerField(
         validators=[MinValueValidator(1)]
     )
+    percentage = models.GeneratedField(
+        expression=Coalesce(F('marks_obtained') * 100.0 / NullIf(F('max_marks'), 0), 0.0),
+        output_field=models.DecimalField(max_digits=5, decimal_places=2),
+        db_persist=True,
+        help_text="Percentage for this mark, computed by the database on write"
+    )
 
     class Meta:
         ordering = ['-test__date', 'student__roll_number']
         unique_together = ['student', 'test', 'subject_name']
         indexes = [
             models.Index(fields=['student', 'test']),
-            models.Index(fields=['test']),
+            models.Index(
+                fields=['test', 'student'],
+                include=['marks_obtained', 'max_marks'],
+                name='mark_test_student_covering'
+            ),
+            models.Index(fields=['percentage'], name='mark_percentage_idx'),
+        ]
+        constraints = [
+            # Also keeps the percentage column within numeric(5,2)
+            models.CheckConstraint(
+                condition=models.Q(marks_obtained__lte=F('max_marks')),
+                name='mark_obtained_lte_max'
+            ),
         ]
 
     def __str__(self):
         return f"{self.student.name} - {self.test.name} - {self.subject_name}: {self.marks_obtained}/{self.max_marks}"
 
-    @property
-    def percentage(self):
-        """Calculate percentage for this mark"""
-        if self.max_marks > 0:
-            return (self.marks_obtained / self.max_marks) * 100
-        return 0
-
     def clean(self):
         """Validate that marks_obtained doesn't exceed max_marks"""
         from django.core.exceptions import ValidationError
@@ -1,11 +1,13 @@
 from django.core.management.base import BaseCommand
 from students.models import Student, Test, Mark
+from django.db import transaction
 from datetime import date, timedelta
 
 
 class Command(BaseCommand):
     help = 'Seeds the database with sample data for testing (Indian system)'
 
+    @transaction.atomic
     def handle(self, *args, **kwargs):
         self.stdout.write('Seeding database...')
 
@@ -27,10 +29,9 @@ class Command(BaseCommand):
             {'name': 'Neha Patel', 'roll_number': '10A005', 'class_name': '10A', 'email': 'neha@school.com'},
         ]
 
-        students = []
-        for student_data in students_data:
-            student = Student.objects.create(**student_data)
-            students.append(student)
+        students = Student.objects.bulk_create(
+            [Student(**student_data) for student_data in students_data]
+        )
 
         self.stdout.write(self.style.SUCCESS(f'Created {len(students)} students'))
 
@@ -70,10 +71,9 @@ class Command(BaseCommand):
             },
         ]
 
-        tests = []
-        for test_data in tests_data:
-            test = Test.objects.create(**test_data)
-            tests.append(test)
+        tests = Test.objects.bulk_create(
+            [Test(**test_data) for test_data in tests_data]
+        )
 
         self.stdout.write(self.style.SUCCESS(f'Created {len(tests)} tests'))
 
@@ -99,13 +99,13 @@ class Command(BaseCommand):
             {'student': students[2], 'subject_name': 'Social Science', 'marks_obtained': 72},
         ]
 
+        marks = []
         for mark_data in marks_half:
-            subject = next(s for s in half_yearly.subjects if s['name'] == mark_data['subject_name'])
-            Mark.objects.create(
+            marks.append(Mark(
                 test=half_yearly,
-                max_marks=subject['max_marks'],
+                max_marks=half_yearly.subject_max_map[mark_data['subject_name']],
                 **mark_data
-            )
+            ))
 
         # Create Marks for Unit Test 1
         unit_test = tests[1]
@@ -121,13 +121,14 @@ class Command(BaseCommand):
         ]
 
         for mark_data in marks_unit:
-            subject = next(s for s in unit_test.subjects if s['name'] == mark_data['subject_name'])
-            Mark.objects.create(
+            marks.append(Mark(
                 test=unit_test,
-                max_marks=subject['max_marks'],
+                max_marks=unit_test.subject_max_map[mark_data['subject_name']],
                 **mark_data
-            )
+            ))
 
-        self.stdout.write(self.style.SUCCESS(f'Created {len(marks_half) + len(marks_unit)} marks'))
+        Mark.objects.bulk_create(marks, batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(f'Created {len(marks)} marks'))
         self.stdout.write(self.style.SUCCESS('Database seeding completed successfully!'))
 
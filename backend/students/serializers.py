@@ -9,20 +9,12 @@ class StudentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Student
         fields = ['id', 'name', 'roll_number', 'class_name', 'email', 'phone', 'created_at']
-        
-    def validate_roll_number(self, value):
-        """Ensure roll_number is unique (except when updating)"""
-        instance = self.instance
-        if Student.objects.filter(roll_number=value).exclude(pk=instance.pk if instance else None).exists():
-            raise serializers.ValidationError("A student with this roll number already exists.")
-        return value
-    
-    def validate_email(self, value):
-        """Ensure email is unique (except when updating)"""
-        instance = self.instance
-        if Student.objects.filter(email=value).exclude(pk=instance.pk if instance else None).exists():
-            raise serializers.ValidationError("A student with this email already exists.")
-        return value
+        # Uniqueness is enforced by the database constraint; StudentViewSet
+        # translates IntegrityError into a field error instead of pre-querying.
+        extra_kwargs = {
+            'roll_number': {'validators': []},
+            'email': {'validators': []},
+        }
 
 
 class SubjectSerializer(serializers.Serializer):
@@ -111,8 +103,10 @@ class MarkSerializer(serializers.ModelSerializer):
     
     def validate(self, data):
         """Validate that marks_obtained doesn't exceed max_marks"""
-        marks_obtained = data.get('marks_obtained')
-        max_marks = data.get('max_marks')
+        # On partial updates, fall back to the stored values for omitted fields
+        instance = self.instance
+        marks_obtained = data.get('marks_obtained', getattr(instance, 'marks_obtained', None))
+        max_marks = data.get('max_marks', getattr(instance, 'max_marks', None))
         
         if marks_obtained is not None and max_marks is not None:
             if marks_obtained > max_marks:
@@ -121,19 +115,29 @@ class MarkSerializer(serializers.ModelSerializer):
                 )
         
         # Check if subject exists in the test
-        test = data.get('test')
-        subject_name = data.get('subject_name')
+        test = data.get('test', getattr(instance, 'test', None))
+        subject_name = data.get('subject_name', getattr(instance, 'subject_name', None))
         
         if test and subject_name:
-            valid_subjects = [s['name'] for s in test.subjects]
+            valid_subjects = self._valid_subject_names(test)
             if subject_name not in valid_subjects:
                 raise serializers.ValidationError(
                     f"Subject '{subject_name}' is not part of test '{test.name}'. "
-                    f"Valid subjects: {', '.join(valid_subjects)}"
+                    f"Valid subjects: {', '.join(s['name'] for s in test.subjects)}"
                 )
         
         return data
     
+    def _valid_subject_names(self, test):
+        """
+        Subject names of a test, cached on the serializer context so bulk
+        (many=True) writes against the same test walk its JSON only once
+        """
+        cache = self.context.setdefault('valid_subject_names', {})
+        if test.pk not in cache:
+            cache[test.pk] = test.subject_names_set
+        return cache[test.pk]
+    
     def validate_marks_obtained(self, value):
         """Ensure marks obtained is not negative"""
         if value < 0:
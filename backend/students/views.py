@@ -2,7 +2,10 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Sum, F, Q, Count
+from rest_framework.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Sum, F, Q, Count, ExpressionWrapper, FloatField, Prefetch
+from django.db.models.functions import Coalesce, NullIf, Round
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from django.contrib.auth.models import User
@@ -37,14 +40,20 @@ def register(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Check if user already exists
-    if User.objects.filter(username=username).exists():
+    # Check if user already exists (username or email, in one query).
+    # auth_user has no unique constraint on email, so this check stays;
+    # concurrent signups racing on username are caught at INSERT below.
+    matches = set(User.objects.filter(
+        Q(username=username) | Q(email=email)
+    ).values_list('username', flat=True))
+    
+    if username in matches:
         return Response(
             {'error': 'Username already exists'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    if User.objects.filter(email=email).exists():
+    if matches:
         return Response(
             {'error': 'Email already exists'},
             status=status.HTTP_400_BAD_REQUEST
@@ -52,13 +61,14 @@ def register(request):
     
     # Create user
     try:
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=password,
-            first_name=first_name,
-            last_name=last_name
-        )
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=username,
+                email=email,
+                password=password,
+                first_name=first_name,
+                last_name=last_name
+            )
         
         # Generate tokens
         refresh = RefreshToken.for_user(user)
@@ -78,6 +88,12 @@ def register(request):
             }
         }, status=status.HTTP_201_CREATED)
     
+    except IntegrityError:
+        return Response(
+            {'error': 'Username already exists'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -181,6 +197,8 @@ class StudentViewSet(viewsets.ModelViewSet):
         if class_name:
             queryset = queryset.filter(class_name=class_name)
         
+        # The icontains lookups below are served by pg_trgm GIN indexes
+        # (migration 0003) on PostgreSQL instead of sequential scans
         search = self.request.query_params.get('search', None)
         if search:
             queryset = queryset.filter(
@@ -191,6 +209,57 @@ class StudentViewSet(viewsets.ModelViewSet):
         
         return queryset
 
+    def perform_create(self, serializer):
+        self._save_unique(serializer)
+
+    def perform_update(self, serializer):
+        self._save_unique(serializer)
+
+    def _save_unique(self, serializer):
+        """
+        Save the student, turning unique constraint violations on
+        roll_number/email into a 400 response
+        """
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            errors = self._unique_errors(serializer)
+            if errors:
+                raise ValidationError(errors)
+            raise
+
+    def _unique_errors(self, serializer):
+        """
+        Report the unique fields whose submitted value belongs to another
+        student. Only runs after the INSERT/UPDATE has already failed.
+        """
+        messages = {
+            'roll_number': 'A student with this roll number already exists.',
+            'email': 'A student with this email already exists.',
+        }
+        values = {
+            field: serializer.validated_data[field]
+            for field in messages
+            if field in serializer.validated_data
+        }
+        if not values:
+            return {}
+        
+        query = Q()
+        for field, value in values.items():
+            query |= Q(**{field: value})
+        others = Student.objects.filter(query)
+        if serializer.instance is not None:
+            others = others.exclude(pk=serializer.instance.pk)
+        
+        errors = {}
+        for row in others.values('roll_number', 'email'):
+            for field, value in values.items():
+                if row[field] == value:
+                    errors[field] = [messages[field]]
+        return errors
+
 
 # ============ Test ViewSet ============
 
@@ -211,7 +280,7 @@ class TestViewSet(viewsets.ModelViewSet):
         """
         Optionally filter by search query
         """
-        queryset = Test.objects.all()
+        queryset = Test.objects.with_student_count()
         
         search = self.request.query_params.get('search', None)
         if search:
@@ -219,6 +288,11 @@ class TestViewSet(viewsets.ModelViewSet):
         
         return queryset
 
+    def perform_create(self, serializer):
+        """A test that was just created has no marks yet"""
+        test = serializer.save()
+        test.student_count = 0
+
 
 # ============ Mark ViewSet ============
 
@@ -238,8 +312,11 @@ class MarkViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """
         Optionally filter by student_id and test_id
+        
+        Nested tests are prefetched with student_count annotated, so a page
+        of marks costs two queries however many tests it spans
         """
-        queryset = Mark.objects.select_related('student', 'test').all()
+        queryset = self._with_related(Mark.objects.all())
         
         student_id = self.request.query_params.get('student_id', None)
         if student_id:
@@ -251,6 +328,25 @@ class MarkViewSet(viewsets.ModelViewSet):
         
         return queryset
 
+    def perform_create(self, serializer):
+        self._save_with_related(serializer)
+
+    def perform_update(self, serializer):
+        self._save_with_related(serializer)
+
+    def _with_related(self, queryset):
+        return queryset.select_related('student').prefetch_related(
+            Prefetch('test', queryset=Test.objects.with_student_count())
+        )
+
+    def _save_with_related(self, serializer):
+        """
+        Save the mark and re-read it so the nested test in the response
+        carries student_count
+        """
+        mark = serializer.save()
+        serializer.instance = self._with_related(Mark.objects.filter(pk=mark.pk)).get()
+
 
 # ============ Report Views ============
 
@@ -279,33 +375,43 @@ def test_topper(request):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    marks = Mark.objects.filter(test_id=test_id).select_related('student')
+    totals = list(
+        Mark.objects.filter(test_id=test_id)
+        .values('student_id')
+        .annotate(
+            total_obtained=Sum('marks_obtained'),
+            total_maximum=Sum('max_marks'),
+        )
+        .annotate(
+            total_percentage=Round(
+                Coalesce(
+                    ExpressionWrapper(
+                        F('total_obtained') * 100.0 / NullIf(F('total_maximum'), 0),
+                        output_field=FloatField()
+                    ),
+                    0.0
+                ),
+                2
+            )
+        )
+        .order_by('-total_obtained', 'student__roll_number')
+    )
     
-    if not marks.exists():
+    if not totals:
         return Response([], status=status.HTTP_200_OK)
     
-    student_totals = {}
-    for mark in marks:
-        student_id = mark.student.id
-        if student_id not in student_totals:
-            student_totals[student_id] = {
-                'student': mark.student,
-                'total_obtained': 0,
-                'total_maximum': 0
-            }
-        student_totals[student_id]['total_obtained'] += mark.marks_obtained
-        student_totals[student_id]['total_maximum'] += mark.max_marks
-    
-    toppers = []
-    for student_id, data in student_totals.items():
-        percentage = (data['total_obtained'] / data['total_maximum'] * 100) if data['total_maximum'] > 0 else 0
-        toppers.append({
-            'student': data['student'],
-            'total_marks': data['total_obtained'],
-            'percentage': round(percentage, 2)
-        })
+    students = Student.objects.only(*StudentSerializer.Meta.fields).in_bulk(
+        [row['student_id'] for row in totals]
+    )
     
-    toppers.sort(key=lambda x: x['total_marks'], reverse=True)
+    toppers = [
+        {
+            'student': students[row['student_id']],
+            'total_marks': row['total_obtained'],
+            'percentage': row['total_percentage']
+        }
+        for row in totals
+    ]
     
     serializer = TopperSerializer(toppers, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -321,40 +427,59 @@ def global_top_performers(request):
     Returns list of top performing students with total marks and average percentage
     """
     class_name = request.query_params.get('class')
-    limit = int(request.query_params.get('limit', 10))
+    try:
+        limit = int(request.query_params.get('limit', 10))
+    except ValueError:
+        limit = -1
     
-    marks_queryset = Mark.objects.select_related('student', 'test').all()
+    if limit < 0:
+        return Response(
+            {'error': 'limit must be a non-negative integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    marks_queryset = Mark.objects.all()
     
     if class_name:
         marks_queryset = marks_queryset.filter(student__class_name=class_name)
     
-    if not marks_queryset.exists():
-        return Response([], status=status.HTTP_200_OK)
-    
-    student_totals = {}
-    for mark in marks_queryset:
-        student_id = mark.student.id
-        if student_id not in student_totals:
-            student_totals[student_id] = {
-                'student': mark.student,
-                'total_obtained': 0,
-                'total_maximum': 0
-            }
-        student_totals[student_id]['total_obtained'] += mark.marks_obtained
-        student_totals[student_id]['total_maximum'] += mark.max_marks
+    totals = list(
+        marks_queryset
+        .values('student_id')
+        .annotate(
+            total_obtained=Sum('marks_obtained'),
+            total_maximum=Sum('max_marks'),
+        )
+        .annotate(
+            total_percentage=Round(
+                Coalesce(
+                    ExpressionWrapper(
+                        F('total_obtained') * 100.0 / NullIf(F('total_maximum'), 0),
+                        output_field=FloatField()
+                    ),
+                    0.0
+                ),
+                2
+            )
+        )
+        .order_by('-total_percentage', '-total_obtained', 'student__roll_number')[:limit]
+    )
     
-    performers = []
-    for student_id, data in student_totals.items():
-        percentage = (data['total_obtained'] / data['total_maximum'] * 100) if data['total_maximum'] > 0 else 0
-        performers.append({
-            'student': data['student'],
-            'total_marks': data['total_obtained'],
-            'percentage': round(percentage, 2)
-        })
+    if not totals:
+        return Response([], status=status.HTTP_200_OK)
     
-    performers.sort(key=lambda x: (x['percentage'], x['total_marks']), reverse=True)
+    students = Student.objects.only(*StudentSerializer.Meta.fields).in_bulk(
+        [row['student_id'] for row in totals]
+    )
     
-    performers = performers[:limit]
+    performers = [
+        {
+            'student': students[row['student_id']],
+            'total_marks': row['total_obtained'],
+            'percentage': row['total_percentage']
+        }
+        for row in totals
+    ]
     
     serializer = TopperSerializer(performers, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)